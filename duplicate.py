@@ -1,4 +1,5 @@
 import base64
+import hashlib
 import json
 import re
 import logging
@@ -14,6 +15,13 @@ class DuplicateChecker:
     def __init__(self):
         self.seen_hashes = set()
         self.seen_configs = set()
+        self.duplicate_count = 0
+    
+    def reset(self):
+        """Forget all seen links and reset the duplicate counter"""
+        self.seen_hashes.clear()
+        self.seen_configs.clear()
+        self.duplicate_count = 0
     
     def normalize_link(self, link: str) -> str:
         """Normalize link for better duplicate detection"""
@@ -52,10 +60,14 @@ class DuplicateChecker:
         # Fallback to normalized link
         return self.normalize_link(link)
     
+    def fingerprint(self, value: str) -> bytes:
+        """Return a fixed 8-byte digest used as the seen-set key instead of the full string"""
+        return hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+    
     def is_duplicate(self, link: str) -> bool:
         """Check if link is a duplicate"""
-        normalized = self.normalize_link(link)
-        config_sig = self.extract_config_signature(link)
+        normalized = self.fingerprint(self.normalize_link(link))
+        config_sig = self.fingerprint(self.extract_config_signature(link))
         
         # Check if we've seen this exact link or config before
         if normalized in self.seen_hashes or config_sig in self.seen_configs:
@@ -66,17 +78,23 @@ class DuplicateChecker:
         self.seen_configs.add(config_sig)
         return False
     
-    def deduplicate_links(self, links: Dict[str, List[str]]) -> Dict[str, List[str]]:
-        """Remove duplicates from links dictionary"""
-        deduplicated = {'vmess': [], 'vless': [], 'ss': [], 'trojan': [], 'ssr': []}
-        duplicate_count = 0
+    def merge(self, links: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """Absorb links into the seen sets and return only the novel ones"""
+        novel = {'vmess': [], 'vless': [], 'ss': [], 'trojan': [], 'ssr': []}
         
         for protocol, protocol_links in links.items():
             for link in protocol_links:
                 if not self.is_duplicate(link):
-                    deduplicated[protocol].append(link)
+                    novel[protocol].append(link)
                 else:
-                    duplicate_count += 1
+                    self.duplicate_count += 1
+        
+        return novel
+    
+    def deduplicate_links(self, links: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """Remove duplicates from links dictionary"""
+        previous_count = self.duplicate_count
+        deduplicated = self.merge(links)
         
-        logger.info(f"Removed {duplicate_count} duplicate links")
+        logger.info(f"Removed {self.duplicate_count - previous_count} duplicate links")
         return deduplicated
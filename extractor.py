@@ -6,18 +6,48 @@ from typing import List, Dict, Set
 
 logger = logging.getLogger(__name__)
 
+# Improved regex patterns for different VPN protocols
+_PATTERN_SOURCES = {
+    'vmess': r'vmess://[A-Za-z0-9+/=]{8,}(?=\s|$|vmess://|vless://|ss://|trojan://|ssr://)',
+    'vless': r'vless://[a-f0-9\-]{36}@[^\s]+?(?=\s|$|vmess://|vless://|ss://|trojan://|ssr://)',
+    'ss': r'ss://[A-Za-z0-9+/=]{8,}@[^\s#]+(?:#[^\s]*?)?(?=\s|$|vmess://|vless://|ss://|trojan://|ssr://)',
+    'trojan': r'trojan://[a-f0-9\-]{8,}@[^\s]+?(?=\s|$|vmess://|vless://|ss://|trojan://|ssr://)',
+    'ssr': r'ssr://[A-Za-z0-9+/=]{12,}(?=\s|$|vmess://|vless://|ss://|trojan://|ssr://)'
+}
+
+# One alternation with a named group per protocol, so each text is scanned once
+LINK_PATTERN = re.compile(
+    '|'.join(f'(?P<{protocol}>{source})' for protocol, source in _PATTERN_SOURCES.items()),
+    re.IGNORECASE
+)
+
+# Length of the longest scheme name ("trojan")
+MAX_SCHEME_LEN = 6
+
+# Posts longer than this are scanned in whitespace-aligned windows
+MAX_SCAN_CHUNK = 64 * 1024
+_WHITESPACE = re.compile(r'\s')
+
+
+def _split_on_whitespace_windows(text: str, size: int):
+    """Yield consecutive slices of at least size characters, cut only before whitespace.
+    
+    Links never contain whitespace, so no link can straddle two windows.
+    """
+    start = 0
+    while len(text) - start > size:
+        boundary = _WHITESPACE.search(text, start + size)
+        if not boundary:
+            break
+        yield text[start:boundary.start()]
+        start = boundary.start()
+    yield text[start:]
+
 class VPNLinkExtractor:
     """Extract and validate VPN links from text content"""
     
     def __init__(self):
-        # Improved regex patterns for different VPN protocols
-        self.patterns = {
-            'vmess': re.compile(r'vmess://[A-Za-z0-9+/=]{8,}(?=\s|$|vmess://|vless://|ss://|trojan://|ssr://)', re.IGNORECASE),
-            'vless': re.compile(r'vless://[a-f0-9\-]{36}@[^\s]+?(?=\s|$|vmess://|vless://|ss://|trojan://|ssr://)', re.IGNORECASE),
-            'ss': re.compile(r'ss://[A-Za-z0-9+/=]{8,}@[^\s#]+(?:#[^\s]*?)?(?=\s|$|vmess://|vless://|ss://|trojan://|ssr://)', re.IGNORECASE),
-            'trojan': re.compile(r'trojan://[a-f0-9\-]{8,}@[^\s]+?(?=\s|$|vmess://|vless://|ss://|trojan://|ssr://)', re.IGNORECASE),
-            'ssr': re.compile(r'ssr://[A-Za-z0-9+/=]{12,}(?=\s|$|vmess://|vless://|ss://|trojan://|ssr://)', re.IGNORECASE)
-        }
+        self.pattern = LINK_PATTERN
     
     def is_valid_base64(self, s: str) -> bool:
         """Check if string is valid base64"""
@@ -132,22 +162,54 @@ class VPNLinkExtractor:
         """Extract all VPN links from text with improved validation"""
         links = {'vmess': [], 'vless': [], 'ss': [], 'trojan': [], 'ssr': []}
         
-        for protocol, pattern in self.patterns.items():
-            matches = pattern.findall(text)
-            
-            for match in matches:
-                # Additional validation based on protocol
-                if protocol == 'ss' and not self.validate_ss_link(match):
-                    logger.debug(f"Invalid SS link filtered: {match[:50]}...")
-                    continue
-                elif protocol == 'vmess' and not self.validate_vmess_link(match):
-                    logger.debug(f"Invalid VMess link filtered: {match[:50]}...")
-                    continue
-                elif self.validate_link(match):
-                    links[protocol].append(match)
+        # Every supported scheme contains "://"; a plain substring check is far
+        # cheaper than running the regex over posts without any links
+        if '://' not in text:
+            return links
+        
+        if len(text) > MAX_SCAN_CHUNK:
+            for chunk in _split_on_whitespace_windows(text, MAX_SCAN_CHUNK):
+                self._scan(chunk, links)
+        else:
+            self._scan(text, links)
         
         return links
     
+    def _scan(self, text: str, links: Dict[str, List[str]]):
+        """Append every valid link found in text to links"""
+        found = self.pattern.search(text)
+        while found:
+            protocol = found.lastgroup
+            match = found.group()
+            
+            # Additional validation based on protocol
+            if protocol == 'ss' and not self.validate_ss_link(match):
+                logger.debug(f"Invalid SS link filtered: {match[:50]}...")
+            elif protocol == 'vmess' and not self.validate_vmess_link(match):
+                logger.debug(f"Invalid VMess link filtered: {match[:50]}...")
+            elif self.validate_link(match):
+                links[protocol].append(match)
+                found = self.pattern.search(text, self._resume_pos(text, found))
+                continue
+            
+            # A rejected match may have swallowed the start of a real link
+            found = self.pattern.search(text, found.start() + 1)
+    
+    def _resume_pos(self, text: str, found: re.Match) -> int:
+        """Return where to continue scanning after an accepted match
+        
+        A match can end inside the next link's scheme when links are glued
+        together (e.g. base64 followed by "vless://" stops before "ss://"), so
+        scanning resumes just before the first "://" after this match's own
+        scheme, if one lies inside the match or right after it.
+        """
+        start, end = found.span()
+        body_start = text.index('://', start) + 3
+        nested = text.find('://', body_start, end + MAX_SCHEME_LEN + 1)
+        if nested == -1:
+            return end
+        return max(body_start, nested - MAX_SCHEME_LEN)
+    
     def validate_link(self, link: str) -> bool:
         """Basic validation of VPN link format"""
         try:
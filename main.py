@@ -5,8 +5,11 @@ Raplink Service - VPN Link Scraper and Tester
 
 import argparse
 import asyncio
+import atexit
 import logging
-from typing import List, Dict
+import logging.handlers
+import queue
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
 import scrapper
@@ -15,73 +18,136 @@ import duplicate
 import manager
 import aiohttp
 import traceback
-import io
+import itertools
 
-from utils import read_channels_from_file
+from utils import positive_int, read_channels_from_file
 
 __version__ = "1.1.0"
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("raplink.log"), logging.StreamHandler()],
-)
+# Configure logging; handlers write from a listener thread so coroutines never block on them
+_log_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+_log_handlers = [logging.FileHandler("raplink.log"), logging.StreamHandler()]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+
+# Not basicConfig: it would give the QueueHandler a formatter and every line a second prefix
+_root_logger = logging.getLogger()
+_root_logger.setLevel(logging.INFO)
+_root_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+
+# Running from import time keeps records flowing for callers that use main() or
+# ChannelScraper directly; stopping at exit drains the queue before logging shuts down
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
+PROTOCOLS = ("vmess", "vless", "ss", "trojan", "ssr")
+
 
 class ChannelScraper:
     """Scrape multiple Telegram channels for VPN links"""
 
-    def __init__(self, channels: List[str]):
+    def __init__(
+        self,
+        channels: List[str],
+        max_concurrency: int = 16,
+        max_posts: int = scrapper.MAX_FETCH,
+        max_links: Optional[int] = None,
+    ):
         self.channels = channels
+        self.max_posts = max_posts
+        self.max_links = max_links
+        self._sem = asyncio.Semaphore(max_concurrency)
         self.extractor = extractor.VPNLinkExtractor()
         self.duplicate_checker = duplicate.DuplicateChecker()
 
+    def _scrape_and_extract(self, channel: str) -> Tuple[Dict[str, List[str]], int]:
+        """Fetch a channel's posts and extract their links (blocking), with the link count"""
+        scraper = scrapper.TelegramChannelScraper(channel, max_posts=self.max_posts)
+        items = scraper.get_items()
+
+        # Dicts drop exact duplicates within this channel at insertion time while
+        # keeping post order, so the global dedup keeps the same link on every run
+        all_links = {protocol: {} for protocol in PROTOCOLS}
+        vmess, vless, ss, trojan, ssr = (all_links[protocol] for protocol in PROTOCOLS)
+        extract = self.extractor.extract_links
+        max_links = self.max_links
+
+        # items is a generator, so stopping early also skips fetching further pages
+        for post in items:
+            content = getattr(post, "content", None)
+            if not content:
+                continue
+            links = extract(content)
+            vmess.update(dict.fromkeys(links["vmess"]))
+            vless.update(dict.fromkeys(links["vless"]))
+            ss.update(dict.fromkeys(links["ss"]))
+            trojan.update(dict.fromkeys(links["trojan"]))
+            ssr.update(dict.fromkeys(links["ssr"]))
+            # Stop before pulling the next post, which may trigger another page fetch
+            if max_links and len(vmess) + len(vless) + len(ss) + len(trojan) + len(ssr) >= max_links:
+                break
+
+        total_found = len(vmess) + len(vless) + len(ss) + len(trojan) + len(ssr)
+
+        return {
+            protocol: list(protocol_links)
+            for protocol, protocol_links in all_links.items()
+        }, total_found
+
     async def scrape_channel(self, channel: str) -> Dict[str, List[str]]:
         """Scrape a single channel"""
-        try:
-            logger.info(f"Scraping channel: {channel}")
-            scraper = scrapper.TelegramChannelScraper(channel)
-            items = scraper.get_items()
-
-            all_links = {"vmess": [], "vless": [], "ss": [], "trojan": [], "ssr": []}
-
-            for post in items:
-                if hasattr(post, "content") and post.content:
-                    links = self.extractor.extract_links(post.content)
-                    for protocol in all_links:
-                        all_links[protocol].extend(links[protocol])
-
-            # Remove duplicates within this channel
-            channel_dedup = duplicate.DuplicateChecker()
-            all_links = channel_dedup.deduplicate_links(all_links)
-
-            logger.info(
-                f"Channel {channel}: Found {sum(len(v) for v in all_links.values())} valid links"
-            )
-            return all_links
-
-        except Exception as e:
-            logger.error(f"Error scraping channel {channel}: {e}")
-            return {"vmess": [], "vless": [], "ss": [], "trojan": [], "ssr": []}
-
-    async def scrape_all_channels(self) -> Dict[str, List[str]]:
-        """Scrape all channels concurrently"""
+        async with self._sem:
+            try:
+                log_info = logger.isEnabledFor(logging.INFO)
+                if log_info:
+                    logger.info(f"Scraping channel: {channel}")
+                # The scraper uses blocking HTTP, keep it off the event loop
+                all_links, total = await asyncio.to_thread(self._scrape_and_extract, channel)
+
+                if log_info:
+                    logger.info(f"Channel {channel}: Found {total} valid links")
+                return all_links
+
+            except Exception as e:
+                logger.error(f"Error scraping channel {channel}: {e}")
+                return {protocol: [] for protocol in PROTOCOLS}
+
+    def _merge_into(self, combined_links: Dict[str, List[str]], result: Dict[str, List[str]]) -> int:
+        """Merge a channel result into the combined links, skipping duplicates
+
+        Returns the number of links added.
+        """
+        novel_links = self.duplicate_checker.merge(result)
+        added = 0
+        for protocol in combined_links:
+            protocol_links = novel_links[protocol]
+            combined_links[protocol].extend(protocol_links)
+            added += len(protocol_links)
+        return added
+
+    async def scrape_all_channels(self) -> Tuple[Dict[str, List[str]], int]:
+        """Scrape all channels concurrently, merging results as they complete
+
+        Returns the combined links and their total count.
+        """
+        self.duplicate_checker.reset()
+        total_links = 0
         tasks = [self.scrape_channel(channel) for channel in self.channels]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
 
-        combined_links = {"vmess": [], "vless": [], "ss": [], "trojan": [], "ssr": []}
+        combined_links = {protocol: [] for protocol in PROTOCOLS}
 
-        for result in results:
-            if isinstance(result, dict):
-                for protocol in combined_links:
-                    combined_links[protocol].extend(result[protocol])
+        # A single checker holds the seen sets across all channels
+        # scrape_channel handles its own errors, so every result is a links dict
+        for next_result in asyncio.as_completed(tasks):
+            total_links += self._merge_into(combined_links, await next_result)
 
-        # Final global deduplication across all channels
-        combined_links = self.duplicate_checker.deduplicate_links(combined_links)
+        logger.info(f"Removed {self.duplicate_checker.duplicate_count} duplicate links")
 
-        return combined_links
+        return combined_links, total_links
 
 # class NamiraInterface:
 #     """Interface to communicate with the Go rayping service"""
@@ -89,35 +155,47 @@ class ChannelScraper:
 #     def __init__(self, namira_xapi: str, namira_url: str = "http://localhost:8080"):
 #         self.service_url = namira_url
 #         self.xapi = namira_xapi
+#         self._session = None
+
+#     async def __aenter__(self):
+#         self._session = aiohttp.ClientSession(
+#             headers={"X-API-Key": self.xapi},
+#             connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300),
+#         )
+#         return self
+
+#     async def __aexit__(self, exc_type, exc, tb):
+#         await self._session.close()
+#         self._session = None
 
 #     async def send_links(self, links_dict: dict) -> Dict:
-#         """Send links from a dictionary to namira service (as in-memory file)"""
+#         """Send links from a dictionary to namira service (as a streamed file)"""
 #         try:
-#             links_content = "\n".join(str(link) for link in links_dict.values())
-
-#             headers = {"X-API-Key": self.xapi}
-#             async with aiohttp.ClientSession(headers=headers) as session:
-#                 data = aiohttp.FormData()
-#                 mem_file = io.BytesIO(links_content.encode("utf-8"))
-#                 data.add_field(
-#                     'file',
-#                     mem_file,
-#                     filename='links.txt',
-#                     content_type='text/plain'
-#                 )
-
-#                 async with session.post(
-#                     f"{self.service_url}/scan",
-#                     data=data,
-#                     timeout=aiohttp.ClientTimeout(total=100)
-#                 ) as response:
-#                     if response.status == 200:
-#                         result = await response.json()
-#                         logger.info("namira data has been sent to URI")
-#                         return result
-#                     else:
-#                         logger.error(f"namira service error: {response.status}")
-#                         return {}
+#             async def _link_gen():
+#                 # Stream one link per line so the upload never holds the full file in memory
+#                 for link in itertools.chain.from_iterable(links_dict.values()):
+#                     yield f"{link}\n".encode("utf-8")
+
+#             data = aiohttp.FormData()
+#             data.add_field(
+#                 'file',
+#                 _link_gen(),
+#                 filename='links.txt',
+#                 content_type='text/plain'
+#             )
+
+#             async with self._session.post(
+#                 f"{self.service_url}/scan",
+#                 data=data,
+#                 timeout=aiohttp.ClientTimeout(total=100)
+#             ) as response:
+#                 if response.status == 200:
+#                     result = await response.json()
+#                     logger.info("namira data has been sent to URI")
+#                     return result
+#                 else:
+#                     logger.error(f"namira service error: {response.status}")
+#                     return {}
 #         except Exception:
 #             logger.error(
 #                 "Error communicating with rayping service on %s:\n%s",
@@ -156,6 +234,24 @@ async def main():
     parser.add_argument(
         "--export-only", action="store_true", help="Only export links without testing"
     )
+    parser.add_argument(
+        "--max-concurrency",
+        type=positive_int,
+        default=16,
+        help="Maximum number of channels scraped at the same time",
+    )
+    parser.add_argument(
+        "--max-posts-per-channel",
+        type=positive_int,
+        default=scrapper.MAX_FETCH,
+        help="Stop reading a channel after this many posts",
+    )
+    parser.add_argument(
+        "--max-links-per-channel",
+        type=positive_int,
+        default=None,
+        help="Stop reading a channel once this many unique links were found",
+    )
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
 
     args = parser.parse_args()
@@ -168,40 +264,56 @@ async def main():
     logger.info(f"Raplink Service {__version__} starting...")
     logger.info(f"Channels to scrape: {channels}")
 
+    # Eager tasks start running immediately instead of waiting a loop iteration (Python 3.12+)
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
     # Initialize components
-    scraper = ChannelScraper(channels)
+    scraper = ChannelScraper(
+        channels,
+        args.max_concurrency,
+        args.max_posts_per_channel,
+        args.max_links_per_channel,
+    )
     link_manager = manager.LinkManager(args.output)
     # namira = NamiraInterface(args.namira_xapi, args.namira_url)
 
     try:
         logger.info("Starting channel scrape...")
-        links = await scraper.scrape_all_channels()
+        links, total_links = await scraper.scrape_all_channels()
 
-        total_links = sum(len(v) for v in links.values())
         logger.info(f"Total valid links found: {total_links}")
 
         if total_links == 0:
             logger.warning("No valid links found. Check your channels and try again.")
             return
 
-        logger.info("Saving validated links...")
+        logger.info("Saving and exporting validated links...")
         metadata = {
             "channels": channels,
             "scraping_timestamp": datetime.now().isoformat(),
             "version": __version__,
             "validation_enabled": True,
         }
-        link_manager.save_links(links, metadata)
 
-        logger.info("Exporting links for testing...")
-        link_manager.export_for_testing(links)
+        # async def upload_to_namira():
+        #     async with namira:
+        #         return await namira.send_links(links)
+
+        # Started before the export so the upload overlaps the disk writes below
+        # upload_task = None
+        # if not args.export_only:
+        #     logger.info("Sending links to namira service")
+        #     upload_task = asyncio.create_task(upload_to_namira())
+
+        # Disk writes run in a worker thread to keep them off the event loop
+        await asyncio.to_thread(link_manager.save_and_export, links, metadata)
 
         if args.export_only:
             logger.info("Export-only mode. Exiting.")
             return
 
-        # logger.info("Sending links to namira service")
-        # await namira.send_links(links)
+        # await upload_task
 
         logger.info("Scraping completed successfully!")
 
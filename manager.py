@@ -6,18 +6,28 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
 class LinkManager:
     """Manage VPN links - save, load, sort"""
     
     def __init__(self, output_file: str = "result.json"):
         self.output_file = output_file
     
-    def save_links(self, links: Dict[str, List[str]], metadata: Dict = None):
-        """Save links to JSON file with metadata"""
-        # Calculate statistics
-        total_links = sum(len(v) for v in links.values())
+    def _link_stats(self, links: Dict[str, List[str]]):
+        """Return per-protocol counts (non-empty protocols only) and the total"""
         link_stats = {protocol: len(protocol_links) for protocol, protocol_links in links.items() if protocol_links}
-        
+        return link_stats, sum(link_stats.values())
+    
+    def _write_json(self, links: Dict[str, List[str]], metadata: Dict, link_stats: Dict[str, int], total_links: int):
+        """Write links, statistics and metadata to the JSON output file"""
         data = {
             'timestamp': datetime.now().isoformat(),
             'total_links': total_links,
@@ -27,8 +37,8 @@ class LinkManager:
         }
         
         try:
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(self.output_file, 'wb') as f:
+                f.write(_dumps(data))
             logger.info(f"Saved {total_links} links to {self.output_file}")
             
             # Log statistics
@@ -38,6 +48,22 @@ class LinkManager:
         except Exception as e:
             logger.error(f"Error saving links: {e}")
     
+    def _write_txt(self, links: Dict[str, List[str]], filename: str, total_links: int):
+        """Write one link per line to a plain text file"""
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                for protocol_links in links.values():
+                    for link in protocol_links:
+                        f.write(f"{link}\n")
+            logger.info(f"Exported {total_links} validated links for testing to {filename}")
+        except Exception as e:
+            logger.error(f"Error exporting links for testing: {e}")
+    
+    def save_links(self, links: Dict[str, List[str]], metadata: Dict = None):
+        """Save links to JSON file with metadata"""
+        link_stats, total_links = self._link_stats(links)
+        self._write_json(links, metadata, link_stats, total_links)
+    
     def load_links(self) -> Dict:
         """Load links from JSON file"""
         try:
@@ -52,13 +78,11 @@ class LinkManager:
     
     def export_for_testing(self, links: Dict[str, List[str]], filename: str = "links.txt"):
         """Export all links to a simple text file for the Go testing service"""
-        try:
-            total_links = 0
-            with open(filename, 'w', encoding='utf-8') as f:
-                for protocol, protocol_links in links.items():
-                    for link in protocol_links:
-                        f.write(f"{link}\n")
-                        total_links += 1
-            logger.info(f"Exported {total_links} validated links for testing to {filename}")
-        except Exception as e:
-            logger.error(f"Error exporting links for testing: {e}")
+        _, total_links = self._link_stats(links)
+        self._write_txt(links, filename, total_links)
+    
+    def save_and_export(self, links: Dict[str, List[str]], metadata: Dict = None, filename: str = "links.txt"):
+        """Save links to the JSON file and export them for testing in a single pass"""
+        link_stats, total_links = self._link_stats(links)
+        self._write_txt(links, filename, total_links)
+        self._write_json(links, metadata, link_stats, total_links)
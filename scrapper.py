@@ -101,15 +101,17 @@ class TelegramChannelScraper(base.Scraper):
     
     name = 'telegram-channel'
 
-    def __init__(self, name, **kwargs):
+    def __init__(self, name, max_posts=MAX_FETCH, **kwargs):
         """Initialize the Telegram channel scraper.
         
         Args:
             name: The username of the Telegram channel (without @)
+            max_posts: Maximum number of posts yielded by get_items
             **kwargs: Additional arguments passed to the base Scraper
         """
         super().__init__(**kwargs)
         self._name = name
+        self._max_posts = max_posts
         self._headers = {
             'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
                           'AppleWebKit/537.36 (KHTML, like Gecko) '
@@ -310,10 +312,10 @@ class TelegramChannelScraper(base.Scraper):
             )
 
     def get_items(self):
-        """Get up to 1000 latest posts from the Telegram channel.
+        """Get up to max_posts latest posts from the Telegram channel.
         
         Yields:
-            TelegramPost: Individual posts from the channel (limited to 1000)
+            TelegramPost: Individual posts from the channel (limited to max_posts)
             
         Raises:
             base.ScraperException: If pages cannot be retrieved
@@ -326,7 +328,7 @@ class TelegramChannelScraper(base.Scraper):
             return
             
         post_count = 0
-        max_posts = MAX_FETCH
+        max_posts = self._max_posts
         
         while post_count < max_posts:
             posts_yielded_this_page = 0
@@ -1,12 +1,26 @@
+import argparse
+
+
 def read_channels_from_file(file_path):
-    """Read Telegram channels from a text file, one channel per line."""
+    """Read Telegram channels from a text file, one channel per line.
+
+    Blank lines are skipped and repeated channels are kept only once, in file order.
+    """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            channels = [line.strip() for line in f if line.strip()]
-        return channels
+            raw = f.read().splitlines()
+        return list(dict.fromkeys(s for s in map(str.strip, raw) if s))
     except FileNotFoundError:
         print(f"Error: Input file '{file_path}' not found.")
         return []
     except Exception as e:
         print(f"Error reading input file: {e}")
         return []
+
+
+def positive_int(value):
+    """argparse type for integer options that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number